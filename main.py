@@ -1,10 +1,21 @@
+import re
+import sys
 import json
-import markdown
+import hashlib
+import functools
+import time
+import mistune
+import css_inline
+from cachetools import LRUCache
+from jinja2 import Environment, FileSystemLoader
 from datetime import datetime
+from html import escape
+from pathlib import Path
 from zoneinfo import ZoneInfo
-from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
 
 app = FastAPI(title="微信公众号HTML生成器")
 
@@ -25,243 +36,303 @@ class ConvertResponse(BaseModel):
     html: str = Field(..., description="生成的HTML内容")
 
 
+# 需要补充内联样式的标签（简约扁平化风格）
+# 注意：h2标签在generate_html_content中已经有样式，这里不处理
+_TAG_STYLES = {
+    # 段落
+    'p': 'margin: 0 0 12px 0; line-height: 1.75; color: #4A5568;',
+    # 列表
+    'ul': 'margin: 12px 0; padding-left: 24px; line-height: 1.75; color: #4A5568;',
+    'ol': 'margin: 12px 0; padding-left: 24px; line-height: 1.75; color: #4A5568;',
+    'li': 'margin: 6px 0; color: #4A5568;',
+    # 粗体
+    'strong': 'font-weight: 600; color: #2C5F8D;',
+    # 引用块（扁平化风格）
+    'blockquote': 'margin: 16px 0; padding: 16px 20px; background: linear-gradient(135deg, #E8F4FD 0%, #E0F7F4 100%); border-left: 4px solid #4A90E2; border-radius: 8px; color: #4A5568; font-style: normal;',
+    # 标题（summary中的markdown可能包含标题）
+    'h1': 'font-size: 26px; font-weight: 600; margin: 24px 0 16px 0; color: #2C5F8D; line-height: 1.4;',
+    'h3': 'font-size: 20px; font-weight: 600; margin: 20px 0 12px 0; color: #2C5F8D; line-height: 1.4;',
+    'h4': 'font-size: 18px; font-weight: 600; margin: 16px 0 10px 0; color: #2C5F8D; line-height: 1.4;',
+}
+
+_DEFAULT_CSS = ''.join(f'{tag}{{{style}}}' for tag, style in _TAG_STYLES.items())
+
+# 由css-inline解析HTML并内联样式，已有的style属性会被保留；不加载外部样式表
+_INLINER = css_inline.CSSInliner(load_remote_stylesheets=False)
+
+
+def apply_inline_styles(fragments: List[str]) -> List[str]:
+    """为markdown生成的HTML片段批量添加内联样式，确保微信公众号兼容性（简约扁平化风格）
+
+    多个片段一次交给css-inline，由其在多核上并行处理
+    """
+    return _INLINER.inline_many_fragments(fragments, [_DEFAULT_CSS] * len(fragments))
+
+
+# 复用同一个mistune解析器；每次解析使用独立的状态，多线程下可直接共享
+# escape=False 保留摘要中的原始HTML，hard_wrap 对应单换行转<br />，插件覆盖常用的扩展语法
+_MD = mistune.create_markdown(
+    escape=False,
+    hard_wrap=True,
+    plugins=['table', 'strikethrough', 'footnotes', 'def_list', 'abbr'],
+)
+
+# mistune会去掉续行开头的Unicode空白，中文段落常用的全角空格（U+3000）缩进因此丢失
+# 解析前将行首的非ASCII空白换成私用区字符（U+F0000 + 原码位），解析后再换回
+_LEADING_UNICODE_SPACE_RE = re.compile(r'^((?:[ \t]*>)*[ \t]*)([^\S\x00-\x7f]+)', re.M)
+_PROTECTED_SPACE_RE = re.compile('[\U000F0000-\U000F3000]')
+_PROTECTED_SPACE_BASE = 0xF0000
+
+
+def _protect_space(match: re.Match) -> str:
+    return match.group(1) + ''.join(chr(_PROTECTED_SPACE_BASE + ord(c)) for c in match.group(2))
+
+
+def _restore_space(match: re.Match) -> str:
+    return chr(ord(match.group(0)) - _PROTECTED_SPACE_BASE)
+
+
+def _render_markdown(markdown_text: str) -> str:
+    """用mistune解析markdown，保留行首的全角空格等非ASCII空白"""
+    if not _LEADING_UNICODE_SPACE_RE.search(markdown_text):
+        return _MD(markdown_text).strip()
+    html = _MD(_LEADING_UNICODE_SPACE_RE.sub(_protect_space, markdown_text)).strip()
+    return _PROTECTED_SPACE_RE.sub(_restore_space, html)
+
+
+# 可能触发markdown语法的字符、行首标记、空行及首尾空白；都不包含时摘要按纯文本处理
+# 非ASCII空白和控制字符经mistune、css-inline后会被改写或删除，也交给完整流程
+_MD_SYNTAX_RE = re.compile(
+    r'[\\`*_~\[\]<>&|\r\x00-\x08\x0b\x0c\x0e-\x1f\x7f]|[^\S\x00-\x7f]'
+    r'|^(?:[-+#:=]|\d+[.)])|^[ \t]*$|^[ \t]|[ \t]$',
+    re.M,
+)
+
+# 纯文本摘要的段落开始标签，样式与markdown转换后内联的一致
+_PLAIN_P_OPEN = apply_inline_styles(['<p></p>'])[0].removesuffix('</p>')
+
+
+def _is_plain_text(markdown_text: str) -> bool:
+    return _MD_SYNTAX_RE.search(markdown_text) is None
+
+
+def _plain_text_to_html(text: str) -> str:
+    """纯文本摘要直接生成段落，换行转为<br>，跳过markdown解析和样式内联"""
+    return _PLAIN_P_OPEN + escape(text, quote=False).replace('\n', '<br>\n') + '</p>'
+
+
+@functools.lru_cache(maxsize=1024)
 def convert_markdown_to_html(markdown_text: str) -> str:
-    """将markdown文本转换为HTML"""
-    md = markdown.Markdown(extensions=['extra', 'nl2br'])
-    html = md.convert(markdown_text)
-    return html
+    """将markdown文本转换为HTML（按原文缓存，重复的摘要直接复用结果）"""
+    if _is_plain_text(markdown_text):
+        return _plain_text_to_html(markdown_text)
+    return apply_inline_styles([_render_markdown(markdown_text)])[0]
+
+
+@functools.lru_cache(maxsize=256)
+def _convert_markdown_batch(markdown_texts: Tuple[str, ...]) -> Tuple[str, ...]:
+    """逐篇解析多段markdown，再一次性内联样式"""
+    return tuple(apply_inline_styles([_render_markdown(text) for text in markdown_texts]))
+
+
+def convert_markdowns_to_html(markdown_texts: List[str]) -> List[str]:
+    """批量将markdown文本转换为HTML，重复的摘要只转换一次
+
+    各摘要独立解析：合并为一篇文档转换会让引用式链接等定义跨文章生效，不安全
+    """
+    batch = tuple(text for text in dict.fromkeys(markdown_texts) if not _is_plain_text(text))
+    if len(batch) > 1:
+        converted = dict(zip(batch, _convert_markdown_batch(batch)))
+    else:
+        converted = {}
+    for text in markdown_texts:
+        if text not in converted:
+            converted[text] = convert_markdown_to_html(text)
+    return [converted[text] for text in markdown_texts]
+
+
+# 忽略大小写匹配公众号域名，无需为每个链接生成小写副本
+_WECHAT_URL_RE = re.compile(r'mp\.weixin\.qq\.com', re.I)
 
 
 def is_wechat_url(url: str) -> bool:
     """判断是否是微信公众号链接"""
     if not url:
         return False
-    return 'mp.weixin.qq.com' in url.lower()
+    return _WECHAT_URL_RE.search(url) is not None
 
 
-def generate_html_content(articles: List[Dict[str, Any]], summary: str = '') -> str:
-    """生成微信公众号HTML内容片段，使用ainews模板样式"""
-    # 类型标题映射
-    type_title_map = {
-        "ai_news": "新闻资讯",
-        "model": "模型资讯",
-        "ai_product": "AI产品资讯"
-    }
-    
+_SHANGHAI_TZ = ZoneInfo('Asia/Shanghai')
+
+
+@functools.lru_cache(maxsize=1)
+def _today_str(minute_bucket: int) -> str:
+    """当前日期字符串（上海时区），按分钟缓存
+
+    上海时区偏移为整小时，零点一定落在分钟边界上，缓存不会跨天
+    """
+    return datetime.now(_SHANGHAI_TZ).strftime('%m月%d日')
+
+
+def _current_date() -> str:
+    return _today_str(int(time.time()) // 60)
+
+
+# 类型标题映射
+_TYPE_TITLE_MAP = {
+    "ai_news": "新闻资讯",
+    "model": "模型资讯",
+    "ai_product": "AI产品资讯"
+}
+
+# 分组输出顺序
+_TYPE_ORDER = ["ai_news", "model", "ai_product"]
+
+# HTML模板在导入时编译一次，生成时直接渲染
+# 标题、链接由模板自动转义，markdown摘要和概览按原样输出
+_TEMPLATE_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / 'template'),
+    autoescape=True,
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+_TEMPLATE_ENV.tests['wechat_url'] = is_wechat_url
+_TEMPLATE = _TEMPLATE_ENV.get_template('wechat.html')
+
+
+def generate_html_content(articles: List[ArticleItem], summary: str = '', wrap: bool = True) -> str:
+    """生成微信公众号HTML内容片段，使用ainews模板样式
+
+    wrap 为 False 时省略外层的编辑器包装结构（mock-iframe 等），只返回内容片段，便于直接粘贴
+    """
     # 按类型分组文章
     articles_by_type = {}
     for article in articles:
-        news_type = article.get('newstype', 'ai_news')
-        if news_type not in articles_by_type:
-            articles_by_type[news_type] = []
-        articles_by_type[news_type].append(article)
-    
-    # 获取当前日期（使用上海时区）
-    current_date = datetime.now(ZoneInfo('Asia/Shanghai')).strftime('%m月%d日')
+        articles_by_type.setdefault(article.newstype, []).append(article)
     
-    # 生成头部（使用动态日期，保持模板样式）
-    header_section = f"""
-<section style="text-align:center;margin-bottom:unset;">
-    <section
-        style="border-width:3px;border-bottom-style:solid;border-color:rgb(0, 0, 34);padding:5px 25px;display:inline-block;box-sizing:border-box;margin-bottom:unset;">
-        <p style="letter-spacing:4px;"><strong><span style="font-size:20px;"><span leaf="">{current_date} · 每日资讯</span></span></strong></p>
-    </section>
-    <p style="letter-spacing:0px;"><span style="font-size:20px;"><span leaf="">Daily AI News</span></span></p>
-    <section
-        style="margin-left:auto;margin-right:auto;width:60px;height:10px;background-color:rgb(67, 212, 201);margin-bottom:unset;overflow:hidden;line-height:0;">
-        <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-</section>
-<p><span leaf=""><br class="ProseMirror-trailingBreak"></span></p>
-"""
+    # 按类型顺序整理分组，跳过没有文章的类型
+    type_groups = [
+        (news_type, articles_by_type[news_type])
+        for news_type in _TYPE_ORDER
+        if articles_by_type.get(news_type)
+    ]
     
-    # 生成新闻概览部分（如果提供了summary）
-    overview_section = ''
-    if summary:
-        # summary 是纯文本，不需要 markdown 转换
-        overview_section = f"""
-<section style="margin-bottom:unset;">
-    <section style="vertical-align:top;margin-bottom:unset;">
-        <section style="margin-left:50px;margin-bottom:-20px;">
-            <p style="letter-spacing:3px;"><span leaf="">新闻概览</span></p>
-        </section>
-        <section
-            style="width:15px;height:15px;margin-right:auto;margin-left:10px;margin-bottom:3px;background-color:rgb(67, 212, 201);overflow:hidden;line-height:0;">
-            <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-        <section style="width:233px;margin-right:auto;margin-bottom:unset;">
-            <section
-                style="width:235px;height:2px;margin-left:3px;margin-bottom:-16px;background-color:rgb(67, 212, 201);overflow:hidden;line-height:0;">
-                <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-            <section
-                style="width:2px;height:85px;margin-left:34px;background-color:rgb(67, 212, 201);margin-bottom:unset;overflow:hidden;line-height:0;">
-                <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-        </section>
-        <section
-            style="padding-left:50px;padding-right:20px;margin-top:-55px;font-size:18px;color:rgb(67, 212, 201);box-sizing:border-box;margin-bottom:unset;">
-            <div style="font-size:18px;color:rgb(67, 212, 201);">{summary}</div>
-        </section>
-    </section>
-</section>
-<p><span leaf=""><br class="ProseMirror-trailingBreak"></span></p>
-"""
+    # 按输出顺序收集所有文章摘要，合并转换markdown
+    summary_htmls = iter(convert_markdowns_to_html([
+        article.summary
+        for _, type_articles in type_groups
+        for article in type_articles
+    ]))
     
-    # 按类型顺序生成分组内容
-    type_order = ["ai_news", "model", "ai_product"]
-    grouped_sections = []
+    groups = [
+        {
+            'title': _TYPE_TITLE_MAP.get(news_type, news_type),
+            'articles': [(article, next(summary_htmls)) for article in type_articles],
+        }
+        for news_type, type_articles in type_groups
+    ]
     
-    for news_type in type_order:
-        if news_type not in articles_by_type or len(articles_by_type[news_type]) == 0:
-            continue
-        
-        type_title = type_title_map.get(news_type, news_type)
-        type_articles = articles_by_type[news_type]
-        type_index = 1  # 该类型的文章编号，从1开始
-        
-        # 生成类型分组标题
-        type_header_section = f"""
-<section style="text-align:center;margin-bottom:unset;">
-    <section
-        style="border-width:3px;border-bottom-style:solid;border-color:rgb(0, 0, 34);padding:5px 25px;display:inline-block;box-sizing:border-box;margin-bottom:unset;">
-        <p style="letter-spacing:4px;"><strong><span style="font-size:20px;"><span leaf="">{type_title}</span></span></strong></p>
-    </section>
-    <section
-        style="margin-left:auto;margin-right:auto;width:60px;height:10px;background-color:rgb(67, 212, 201);margin-bottom:unset;overflow:hidden;line-height:0;">
-        <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-</section>
-<p><span leaf=""><br class="ProseMirror-trailingBreak"></span></p>
-"""
-        grouped_sections.append(type_header_section)
-        
-        # 生成该类型下的文章列表
-        for article in type_articles:
-            title = article.get('title', '')
-            article_summary = article.get('summary', '')
-            url = article.get('url', '')
-            
-            # 转换markdown摘要为HTML
-            summary_html = convert_markdown_to_html(article_summary)
-            
-            # 生成URL显示部分
-            if url:
-                if is_wechat_url(url):
-                    url_display = f'<p style="margin-top: 12px;"><a href="{url}" target="_blank" style="color: rgb(67, 212, 201); text-decoration: none; font-size: 14px;">查看原文 →</a></p>'
-                else:
-                    url_display = f'<p style="margin-top: 12px;"><span style="color: rgb(136, 136, 136); font-size: 14px;">[原文链接]: {url}</span></p>'
-            else:
-                url_display = ''
-            
-            # 生成编号条目（使用模板的旋转方块装饰样式）
-            article_section = f"""
-<section style="margin-bottom:unset;">
-    <section style="margin:10px;">
-        <section
-            style="display:inline-block;background-color:rgb(113, 232, 222);width:35px;height:35px;margin-bottom:unset;overflow:hidden;line-height:0;transform:rotate(45deg);-webkit-transform:rotate(45deg);-moz-transform:rotate(45deg);-ms-transform:rotate(45deg);-o-transform:rotate(45deg);">
-            <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-        <section
-            style="background-color:rgb(113, 232, 222);margin-left:-10px;display:inline-block;width:30px;height:30px;margin-bottom:unset;overflow:hidden;line-height:0;transform:rotate(45deg);-webkit-transform:rotate(45deg);-moz-transform:rotate(45deg);-ms-transform:rotate(45deg);-o-transform:rotate(45deg);">
-            <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-    </section>
-    <section
-        style="margin-left:20px;margin-top:-50px;margin-bottom:unset;transform:rotate(0deg);-webkit-transform:rotate(0deg);-moz-transform:rotate(0deg);-ms-transform:rotate(0deg);-o-transform:rotate(0deg);">
-        <p><strong><span style="font-size:18px;"><span leaf="">no.{type_index} &nbsp; {title}</span></span></strong></p>
-    </section>
-</section>
-<p><span leaf=""><br class="ProseMirror-trailingBreak"></span></p>
-<section style="margin-bottom:unset;">
-    <div style="font-size:15px;letter-spacing:2px;color:#333333;font-family:微软雅黑, Arial;">{summary_html}</div>
-{url_display}
-</section>
-<p><span leaf=""><br class="ProseMirror-trailingBreak"></span></p>
-"""
-            grouped_sections.append(article_section)
-            type_index += 1
-    
-    # 生成尾部（使用模板的end样式）
-    footer_section = """
-<section style="margin-bottom:unset;">
-    <section style="text-align:center;margin-bottom:unset;">
-        <section
-            style="display:inline-block;background-color:rgb(113, 232, 222);width:35px;height:35px;margin-bottom:unset;overflow:hidden;line-height:0;transform:rotate(45deg);-webkit-transform:rotate(45deg);-moz-transform:rotate(45deg);-ms-transform:rotate(45deg);-o-transform:rotate(45deg);">
-            <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-        <section
-            style="background-color:rgb(113, 232, 222);margin-left:-10px;display:inline-block;width:30px;height:30px;margin-bottom:unset;overflow:hidden;line-height:0;transform:rotate(45deg);-webkit-transform:rotate(45deg);-moz-transform:rotate(45deg);-ms-transform:rotate(45deg);-o-transform:rotate(45deg);">
-            <span leaf=""><br class="ProseMirror-trailingBreak"></span></section>
-    </section>
-    <section
-        style="margin-top:-40px;margin-bottom:unset;transform:rotate(0deg);-webkit-transform:rotate(0deg);-moz-transform:rotate(0deg);-ms-transform:rotate(0deg);-o-transform:rotate(0deg);">
-        <p style="text-align:center;"><span
-                style="font-size:18px;color:#ffffff;"><strong><span
-                        leaf="">end</span></strong></span></p>
-    </section>
-</section>
-<p><span leaf=""><br class="ProseMirror-trailingBreak"></span></p>
-"""
-    
-    # 组合所有部分，使用模板的包装结构
-    content_html = header_section + overview_section + ''.join(grouped_sections) + footer_section
-    
-    # 使用模板的完整包装结构
-    final_html = f"""
-<div>
-    <div></div>
-    <div id="ueditor_0" class="mock-iframe">
-        <div class="mock-iframe-document">
-            <div class="mock-iframe-body">
-                <div spellcheck="false" lang="en" class="view rich_media_content autoTypeSetting24psection">
-                    <div contenteditable="true" translate="no" class="ProseMirror"
-                        style="padding: 0px 4px; min-height: 949px;">
-                        <section style="margin-bottom:unset;" data-pm-slice="0 0 []">
-{content_html}
-                        </section>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    <div></div>
-</div>
-"""
-    
-    return final_html
+    return _TEMPLATE.render(
+        # 获取当前日期（使用上海时区）
+        current_date=_current_date(),
+        summary=summary,
+        groups=groups,
+        wrap=wrap,
+    )
 
 
-def apply_inline_styles(html: str) -> str:
-    """为HTML元素添加内联样式，确保微信公众号兼容性（简约扁平化风格）"""
-    import re
-    
-    # 处理段落（只替换没有style属性的p标签）
-    html = re.sub(r'<p(?![^>]*style=)', '<p style="margin: 0 0 12px 0; line-height: 1.75; color: #4A5568;"', html)
-    
-    # 处理列表（只替换没有style属性的标签）
-    html = re.sub(r'<ul(?![^>]*style=)', '<ul style="margin: 12px 0; padding-left: 24px; line-height: 1.75; color: #4A5568;"', html)
-    html = re.sub(r'<ol(?![^>]*style=)', '<ol style="margin: 12px 0; padding-left: 24px; line-height: 1.75; color: #4A5568;"', html)
-    html = re.sub(r'<li(?![^>]*style=)', '<li style="margin: 6px 0; color: #4A5568;"', html)
-    
-    # 处理粗体（只替换没有style属性的strong标签）
-    html = re.sub(r'<strong(?![^>]*style=)', '<strong style="font-weight: 600; color: #2C5F8D;"', html)
-    
-    # 处理引用块（只替换没有style属性的blockquote标签，扁平化风格）
-    html = re.sub(r'<blockquote(?![^>]*style=)', '<blockquote style="margin: 16px 0; padding: 16px 20px; background: linear-gradient(135deg, #E8F4FD 0%, #E0F7F4 100%); border-left: 4px solid #4A90E2; border-radius: 8px; color: #4A5568; font-style: normal;"', html)
-    
-    # 处理标题（只替换没有style属性的标题标签，因为summary中的markdown可能包含标题）
-    html = re.sub(r'<h1(?![^>]*style=)', '<h1 style="font-size: 26px; font-weight: 600; margin: 24px 0 16px 0; color: #2C5F8D; line-height: 1.4;"', html)
-    html = re.sub(r'<h3(?![^>]*style=)', '<h3 style="font-size: 20px; font-weight: 600; margin: 20px 0 12px 0; color: #2C5F8D; line-height: 1.4;"', html)
-    html = re.sub(r'<h4(?![^>]*style=)', '<h4 style="font-size: 18px; font-weight: 600; margin: 16px 0 10px 0; color: #2C5F8D; line-height: 1.4;"', html)
-    # 注意：h2标签在generate_html_content中已经有样式，这里不处理
-    
-    return html
+# /convert 的结果缓存：相同请求体在同一天内生成的HTML完全相同
+# 键为（当前日期, 是否包装, 请求体哈希），日期变化后旧结果自然失效；值为编码好的JSON响应体
+# 按字节数限制缓存总量，超过单条上限的响应不缓存
+_RESP_CACHE_MAX_SIZE = 64 * 1024 * 1024
+_RESP_CACHE_MAX_ITEM_SIZE = 1024 * 1024
+_RESP_CACHE = LRUCache(maxsize=_RESP_CACHE_MAX_SIZE, getsizeof=len)
+
+
+# /convert 的请求体由接口自行解析，FastAPI不会为其生成文档结构
+# 这里按OpenAPI组件的引用格式生成 ConvertRequest 及其嵌套模型的结构，注册到 components 中
+_CONVERT_REQUEST_SCHEMA = ConvertRequest.model_json_schema(ref_template='#/components/schemas/{model}')
+_CONVERT_REQUEST_COMPONENTS = {
+    **_CONVERT_REQUEST_SCHEMA.pop('$defs', {}),
+    'ConvertRequest': _CONVERT_REQUEST_SCHEMA,
+}
+
+
+def _openapi() -> dict:
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        schema.setdefault('components', {}).setdefault('schemas', {}).update(_CONVERT_REQUEST_COMPONENTS)
+    return app.openapi_schema
+
+
+app.openapi = _openapi
+
+
+def _is_json_content_type(content_type: Optional[str]) -> bool:
+    """与FastAPI一致：未声明类型或声明为 application/json、application/*+json 时按JSON解析"""
+    if not content_type:
+        return True
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return media_type == 'application/json' or (
+        media_type.startswith('application/') and media_type.endswith('+json')
+    )
 
 
-@app.post("/convert", response_model=ConvertResponse)
-async def convert_to_html(request: ConvertRequest):
-    """API端点：接收JSON数据，返回生成的HTML字符串"""
+@app.post(
+    "/convert",
+    response_model=ConvertResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/ConvertRequest"}}},
+            "required": True,
+        },
+    },
+)
+async def convert_to_html(request: Request, wrap: bool = True):
+    """API端点：接收JSON数据，返回生成的HTML字符串（?wrap=false 时不含外层包装结构）"""
+    body = await request.body()
+    is_json = _is_json_content_type(request.headers.get('content-type'))
+    key = (_current_date(), wrap, hashlib.blake2b(body, digest_size=16).digest())
+    content = _RESP_CACHE.get(key) if is_json else None
+    if content is not None:
+        return Response(content=content, media_type="application/json")
+    
     try:
-        articles_data = [article.dict() for article in request.articles]
-        html_content = generate_html_content(articles_data, summary=request.summary)
-        # 应用内联样式
-        html_content = apply_inline_styles(html_content)
-        return ConvertResponse(html=html_content)
+        if is_json:
+            convert_request = ConvertRequest.model_validate_json(body)
+        else:
+            # 非JSON请求体不做解析，直接按原始内容校验（必然失败并返回422）
+            convert_request = ConvertRequest.model_validate(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)]
+        )
+    
+    try:
+        html_content = generate_html_content(
+            convert_request.articles, summary=convert_request.summary, wrap=wrap
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"生成HTML时出错: {str(e)}")
+    # 由pydantic-core直接编码为JSON字节，只编码一次，缓存命中时原样返回
+    content = ConvertResponse(html=html_content).model_dump_json().encode()
+    if len(content) <= _RESP_CACHE_MAX_ITEM_SIZE:
+        _RESP_CACHE[key] = content
+    return Response(content=content, media_type="application/json")
+
+
+# 命令行读取的文章缺少字段（或字段为null）时使用的默认值
+_CLI_ARTICLE_DEFAULTS = {'title': '', 'summary': '', 'url': '', 'newstype': 'ai_news'}
+
+
+def _load_cli_article(article: dict) -> Optional[ArticleItem]:
+    """将date.txt中的条目转为ArticleItem，newstype显式为null的条目与未知类型一样跳过"""
+    if 'newstype' in article and article['newstype'] is None:
+        return None
+    fields = {key: value for key, value in article.items() if value is not None}
+    return ArticleItem.model_validate({**_CLI_ARTICLE_DEFAULTS, **fields})
 
 
 def main():
@@ -278,13 +349,17 @@ def main():
         else:
             articles = data.get('articles', [])
             summary = data.get('summary', '')
+        articles = [
+            item for item in (_load_cli_article(article) for article in articles)
+            if item is not None
+        ]
         
         # 生成HTML
         html_content = generate_html_content(articles, summary=summary)
-        html_content = apply_inline_styles(html_content)
         
-        # 直接输出到控制台
-        print(html_content)
+        # 直接输出到控制台（以UTF-8字节一次写入，绕过文本层的编码和按行刷新）
+        sys.stdout.buffer.write(html_content.encode('utf-8'))
+        sys.stdout.buffer.write(b'\n')
         
     except FileNotFoundError:
         print("错误: 找不到 date.txt 文件")
@@ -295,8 +370,6 @@ def main():
 
 
 if __name__ == "__main__":
-    import sys
-    
     # 如果作为API服务器运行
     if len(sys.argv) > 1 and sys.argv[1] == "api":
         import uvicorn